@@ -1,5 +1,6 @@
 import os
 import sys
+import functools
 from pathlib import Path
 from google import genai
 from google.genai import types
@@ -8,16 +9,22 @@ from dotenv import load_dotenv
 # Add parent directory to path for api_manager import
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Load .env once at import instead of re-reading it on every client request
+load_dotenv()
+
 try:
     from api_manager import api_manager
 except ImportError:
     api_manager = None
     print("⚠️ API Manager not found - using fallback single key")
 
+@functools.lru_cache(maxsize=1)
 def get_gemini_client():
-    """Initialize and return a Gemini client with rotating API keys."""
-    load_dotenv()
-    
+    """Initialize and return a Gemini client with rotating API keys.
+
+    The client is cached after the first call; call
+    `get_gemini_client.cache_clear()` to force a rebuild after key rotation.
+    """
     try:
         # Try to get API key from manager first
         if api_manager:
@@ -1,6 +1,10 @@
-import base64
+import functools
 import io
-from PIL import Image
+import os
+import subprocess
+import tempfile
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
 
 try:
     from Quartz import (
@@ -12,6 +16,7 @@ try:
     from Quartz.CoreGraphics import (
         CGImageGetWidth,
         CGImageGetHeight,
+        CGImageGetBytesPerRow,
         CGDataProviderCopyData,
         CGImageGetDataProvider,
     )
@@ -19,126 +24,245 @@ try:
 except ImportError:
     _QUARTZ_AVAILABLE = False
 
-def add_grid_overlay(image, grid_size=20):
-    """Add a high-precision coordinate grid overlay to the image for ultra-precise clicking."""
-    from PIL import ImageDraw, ImageFont
-    
-    # Create a copy to draw on
-    img_with_grid = image.copy()
-    draw = ImageDraw.Draw(img_with_grid)
-    
-    width, height = image.size
-    
-    # Different line colors for major and minor grid lines
-    major_grid_color = (255, 0, 0, 180)  # Red for major lines
-    minor_grid_color = (255, 100, 100, 120)  # Light red for minor lines
-    
-    # Calculate grid spacing
-    grid_width = width // grid_size
-    grid_height = height // grid_size
-    
-    # Draw minor grid lines (thinner, every line)
-    for i in range(grid_size + 1):
-        x = i * grid_width
-        line_width = 2 if i % 5 == 0 else 1  # Thicker every 5th line
-        color = major_grid_color if i % 5 == 0 else minor_grid_color
-        draw.line([(x, 0), (x, height)], fill=color, width=line_width)
-    
-    for i in range(grid_size + 1):
-        y = i * grid_height
-        line_width = 2 if i % 5 == 0 else 1  # Thicker every 5th line
-        color = major_grid_color if i % 5 == 0 else minor_grid_color
-        draw.line([(0, y), (width, y)], fill=color, width=line_width)
-    
-    # Add coordinate labels with higher precision
+# Optional libjpeg-turbo encoder - SIMD DCT/Huffman paths beat PIL's JPEG save
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _TJ = TurboJPEG()
+    _TURBOJPEG_AVAILABLE = True
+except Exception:
+    _TURBOJPEG_AVAILABLE = False
+
+# Optional Numba JIT for the grid raster pass - falls back to NumPy masks
+try:
+    from numba import njit, prange
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+if _NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _paint_grid_numba(arr, grid_width, grid_height):
+        """Paint minor/major grid lines into an RGBA array; LLVM vectorizes the stores."""
+        height = arr.shape[0]
+        width = arr.shape[1]
+        period_x = grid_width * 5
+        period_y = grid_height * 5
+        for y in prange(height):
+            rem_y = y % period_y
+            major_row = rem_y == 0 or rem_y == 1
+            minor_row = y % grid_height == 0
+            for x in range(width):
+                rem_x = x % period_x
+                if major_row:
+                    arr[y, x, 0] = 255; arr[y, x, 1] = 0; arr[y, x, 2] = 0; arr[y, x, 3] = 255
+                elif minor_row:
+                    arr[y, x, 0] = 255; arr[y, x, 1] = 100; arr[y, x, 2] = 100; arr[y, x, 3] = 255
+                elif rem_x == 0 or rem_x == 1:
+                    arr[y, x, 0] = 255; arr[y, x, 1] = 0; arr[y, x, 2] = 0; arr[y, x, 3] = 255
+                elif x % grid_width == 0:
+                    arr[y, x, 0] = 255; arr[y, x, 1] = 100; arr[y, x, 2] = 100; arr[y, x, 3] = 255
+
+# Pre-rendered label sprites keyed by grid_size - label text never changes per frame
+_LABEL_SPRITES = {}
+
+def _get_label_sprites(grid_size):
+    """Render the coordinate labels once and cache them as small paste-able images."""
+    sprites = _LABEL_SPRITES.get(grid_size)
+    if sprites is not None:
+        return sprites
+
     try:
         font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 10)
     except:
         font = ImageFont.load_default()
-    
-    # Add precise coordinate labels (every 5th line to avoid clutter)
+
+    sprites = {}
+    measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
     for i in range(0, grid_size + 1, 5):
         for j in range(0, grid_size + 1, 5):
-            x = i * grid_width
-            y = j * grid_height
-            
             # Convert to ratio coordinates with higher precision
             ratio_x = round(i / grid_size, 2)  # 2 decimal places
             ratio_y = round(j / grid_size, 2)
-            
-            # Draw coordinate label with precise values
             label = f"({ratio_x:.2f},{ratio_y:.2f})"
-            
-            # Add background rectangle for text readability
-            bbox = draw.textbbox((x + 2, y + 2), label, font=font)
-            draw.rectangle(bbox, fill=(255, 255, 255, 220))  # White background
-            draw.text((x + 2, y + 2), label, fill=(0, 0, 0), font=font)
-    
-    # Add crosshairs at center points for extra precision
+
+            # White background rectangle baked into the sprite for readability
+            bbox = measure.textbbox((0, 0), label, font=font)
+            sprite = Image.new('RGB', (bbox[2] - bbox[0] + 1, bbox[3] - bbox[1] + 1), (255, 255, 255))
+            draw = ImageDraw.Draw(sprite)
+            draw.text((-bbox[0], -bbox[1]), label, fill=(0, 0, 0), font=font)
+            sprites[(i, j)] = sprite
+
+    _LABEL_SPRITES[grid_size] = sprites
+    return sprites
+
+@functools.lru_cache(maxsize=4)
+def _overlay_template(width, height, grid_size):
+    """Build the grid overlay once per (size, grid_size) as a transparent RGBA template.
+
+    Lines, labels, and crosshairs depend only on the image geometry, never on
+    screen contents, so the whole overlay is a fixed template we composite.
+    """
+    # Different line colors for major and minor grid lines
+    major_grid_color = (255, 0, 0, 255)  # Red for major lines
+    minor_grid_color = (255, 100, 100, 255)  # Light red for minor lines
+
+    # Calculate grid spacing
+    grid_width = width // grid_size
+    grid_height = height // grid_size
+
+    # Paint all grid lines in one vectorized pass instead of ~40 draw.line calls
+    arr = np.zeros((height, width, 4), dtype=np.uint8)
+
+    if _NUMBA_AVAILABLE:
+        _paint_grid_numba(arr, grid_width, grid_height)
+    else:
+        xs = np.arange(grid_size + 1) * grid_width
+        ys = np.arange(grid_size + 1) * grid_height
+
+        # Minor lines are 1px wide; major lines (every 5th) are 2px wide
+        minor_cols = np.zeros(width, dtype=bool)
+        minor_cols[xs.clip(0, width - 1)] = True
+        major_cols = np.zeros(width, dtype=bool)
+        major_cols[xs[::5].clip(0, width - 1)] = True
+        major_cols[(xs[::5] + 1).clip(0, width - 1)] = True
+
+        minor_rows = np.zeros(height, dtype=bool)
+        minor_rows[ys.clip(0, height - 1)] = True
+        major_rows = np.zeros(height, dtype=bool)
+        major_rows[ys[::5].clip(0, height - 1)] = True
+        major_rows[(ys[::5] + 1).clip(0, height - 1)] = True
+
+        arr[:, minor_cols] = minor_grid_color
+        arr[:, major_cols] = major_grid_color
+        arr[minor_rows, :] = minor_grid_color
+        arr[major_rows, :] = major_grid_color
+
+    # Crosshairs at cell centers: clipped indexed writes instead of ~200 draw.line calls
     crosshair_color = (0, 255, 0, 200)  # Green crosshairs
-    for i in range(1, grid_size, 2):  # Odd positions for center points
-        for j in range(1, grid_size, 2):
-            x = i * grid_width
-            y = j * grid_height
-            
-            # Draw small crosshair
-            draw.line([(x-3, y), (x+3, y)], fill=crosshair_color, width=2)
-            draw.line([(x, y-3), (x, y+3)], fill=crosshair_color, width=2)
-    
+    cx = np.arange(1, grid_size, 2) * grid_width
+    cy = np.arange(1, grid_size, 2) * grid_height
+    X, Y = np.meshgrid(cx, cy)
+    for d in range(-3, 4):
+        xs_d = (X + d).clip(0, width - 1)
+        ys_d = (Y + d).clip(0, height - 1)
+        # Horizontal arm, 2px stroke
+        arr[Y, xs_d] = crosshair_color
+        arr[(Y + 1).clip(0, height - 1), xs_d] = crosshair_color
+        # Vertical arm, 2px stroke
+        arr[ys_d, X] = crosshair_color
+        arr[ys_d, (X + 1).clip(0, width - 1)] = crosshair_color
+
+    template = Image.fromarray(arr, 'RGBA')
+    return _finish_grid_overlay(template, grid_width, grid_height, grid_size)
+
+def add_grid_overlay(image, grid_size=20):
+    """Add a high-precision coordinate grid overlay to the image for ultra-precise clicking."""
+    template = _overlay_template(image.size[0], image.size[1], grid_size)
+    return Image.alpha_composite(image.convert('RGBA'), template).convert('RGB')
+
+def _finish_grid_overlay(img_with_grid, grid_width, grid_height, grid_size):
+    """Paste the labels on top of the painted grid lines and crosshairs."""
+    # Pre-rendered coordinate labels (every 5th line to avoid clutter) -
+    # no per-frame font shaping, textbbox, or rectangle calls
+    for (i, j), sprite in _get_label_sprites(grid_size).items():
+        img_with_grid.paste(sprite, (i * grid_width + 2, j * grid_height + 2))
+
     return img_with_grid
 
+# Reusable encode buffer so each frame doesn't allocate (and free) a fresh multi-MB BytesIO
+_SCRATCH_BUF = io.BytesIO()
+
+def _capture_quartz_image():
+    """Capture the screen straight through Quartz - no subprocess, no intermediate encode."""
+    img_ref = CGWindowListCreateImage(
+        CGRectInfinite, kCGWindowListOptionOnScreenOnly, kCGNullWindowID, 0
+    )
+    if img_ref is None:
+        return None
+
+    width = CGImageGetWidth(img_ref)
+    height = CGImageGetHeight(img_ref)
+    bytes_per_row = CGImageGetBytesPerRow(img_ref)
+    data = CGDataProviderCopyData(CGImageGetDataProvider(img_ref))
+
+    # Quartz hands back BGRX pixels; PIL's raw decoder drops the pad byte for us
+    return Image.frombuffer('RGB', (width, height), bytes(data), 'raw', 'BGRX', bytes_per_row, 1)
+
+# Whether screencapture on this system can stream to stdout via '-'.
+# Resolved on the first failed attempt so unsupported systems don't pay a
+# doomed extra fork per frame.
+_SCREENCAPTURE_STDOUT = True
+
+def _capture_jpeg_subprocess():
+    """Grab a screen JPEG from screencapture, streaming via stdout when supported."""
+    global _SCREENCAPTURE_STDOUT
+    if _SCREENCAPTURE_STDOUT:
+        # '-' sends the image to stdout on recent macOS, so nothing touches disk
+        try:
+            result = subprocess.run([
+                'screencapture',
+                '-x',  # Don't play camera sound
+                '-t', 'jpg',  # JPEG format - skips the PNG encode/decode round-trip
+                '-'
+            ], capture_output=True, check=True)
+            if result.stdout:
+                return result.stdout
+        except subprocess.CalledProcessError:
+            pass
+
+        # Older macOS either rejects '-' or treats it as a filename (leaving
+        # a file literally named '-' behind) - clean up and use the temp-file
+        # path for the rest of the session
+        _SCREENCAPTURE_STDOUT = False
+        try:
+            os.unlink('-')
+        except OSError:
+            pass
+
+    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as temp_file:
+        temp_path = temp_file.name
+    subprocess.run(['screencapture', '-x', '-t', 'jpg', temp_path], capture_output=True, check=True)
+    with open(temp_path, 'rb') as f:
+        jpg_data = f.read()
+    os.unlink(temp_path)
+    return jpg_data
+
 def capture_to_bytes(add_grid=True):
-    """Captures the screen using macOS screencapture command and returns base64 encoded JPEG bytes."""
-    import subprocess
-    import tempfile
-    import os
-    
+    """Captures the screen and returns raw JPEG bytes.
+
+    Callers that need base64 (none do today - the Gemini SDK takes bytes)
+    should encode at the API boundary rather than carrying inflated text
+    through the pipeline.
+    """
     try:
-        # Create a temporary file for the screenshot
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
-            temp_path = temp_file.name
-        
-        # Use macOS screencapture command to capture the main display
-        result = subprocess.run([
-            'screencapture', 
-            '-x',  # Don't play camera sound
-            '-t', 'png',  # PNG format
-            temp_path
-        ], capture_output=True, check=True)
-        
-        # Read the screenshot file
-        with open(temp_path, 'rb') as f:
-            png_data = f.read()
-        
-        # Clean up temp file
-        os.unlink(temp_path)
-        
-        # Convert PNG to JPEG using PIL
-        from PIL import Image
-        import io
-        
-        # Open PNG data
-        png_image = Image.open(io.BytesIO(png_data))
-        
-        # Convert to RGB (remove alpha channel if present)
-        if png_image.mode in ('RGBA', 'LA'):
-            rgb_image = Image.new('RGB', png_image.size, (255, 255, 255))
-            rgb_image.paste(png_image, mask=png_image.split()[-1] if png_image.mode == 'RGBA' else None)
-        else:
-            rgb_image = png_image.convert('RGB')
-        
-        # Add grid overlay for precise clicking
+        # Prefer the in-process Quartz capture - avoids a fork/exec per frame
+        rgb_image = _capture_quartz_image() if _QUARTZ_AVAILABLE else None
+
+        if rgb_image is None:
+            jpg_data = _capture_jpeg_subprocess()
+
+            # Fast path: no grid means no pixels change, so pass the JPEG straight through
+            if not add_grid:
+                return jpg_data
+
+            # Decode once for the grid overlay (screencapture JPEG is already RGB, no alpha)
+            rgb_image = Image.open(io.BytesIO(jpg_data)).convert('RGB')
+
         if add_grid:
             rgb_image = add_grid_overlay(rgb_image, grid_size=20)
-        
-        # Convert to JPEG bytes
-        img_byte_arr = io.BytesIO()
-        rgb_image.save(img_byte_arr, format="JPEG", quality=85)
-        img_bytes = img_byte_arr.getvalue()
-        
-        # Return base64 encoded
-        return base64.b64encode(img_bytes).decode('utf-8')
-        
+
+        # Encode with libjpeg-turbo when available - SIMD color conversion + DCT
+        if _TURBOJPEG_AVAILABLE:
+            return _TJ.encode(np.asarray(rgb_image), quality=85, pixel_format=TJPF_RGB)
+
+        # Convert to JPEG bytes, reusing the scratch buffer across frames
+        _SCRATCH_BUF.seek(0)
+        _SCRATCH_BUF.truncate()
+        rgb_image.save(_SCRATCH_BUF, format="JPEG", quality=85)
+
+        # getvalue() copies out of the reused scratch buffer
+        return _SCRATCH_BUF.getvalue()
+
     except subprocess.CalledProcessError as e:
         print(f"screencapture command failed: {e}")
         return None
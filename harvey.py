@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 
+import io
 import os
+import re
 import sys
 import time
 import subprocess
 import math
 import base64
+import hashlib
+import shutil
+import concurrent.futures
 from pathlib import Path
 
+import numpy as np
+
 sys.path.insert(0, str(Path(__file__).parent))
 
 from agent.screenshot import capture_to_bytes
@@ -22,31 +29,265 @@ except Exception:
     _TTS_AVAILABLE = False
 
 try:
-    from Quartz import CGEventCreateMouseEvent, CGEventPost, kCGHIDEventTap, kCGEventLeftMouseDown, kCGEventLeftMouseUp, CGEventCreateKeyboardEvent, kCGEventKeyDown, kCGEventKeyUp, CGEventSetFlags, kCGEventFlagMaskCommand, kCGEventMouseMoved
+    from Quartz import CGEventCreateMouseEvent, CGEventPost, kCGHIDEventTap, kCGEventLeftMouseDown, kCGEventLeftMouseUp, CGEventCreateKeyboardEvent, kCGEventKeyDown, kCGEventKeyUp, CGEventSetFlags, kCGEventFlagMaskCommand, kCGEventMouseMoved, CGEventSetLocation
     from Quartz.CoreGraphics import CGMainDisplayID, CGDisplayBounds, CGEventCreate, CGEventGetLocation, CGContextRef, CGColorSpaceCreateDeviceRGB, CGContextSetRGBStrokeColor, CGContextStrokePath, CGContextMoveToPoint, CGContextAddLineToPoint, CGContextSetLineWidth
+    from Quartz.CoreGraphics import CGDisplayCopyDisplayMode, CGDisplayModeGetPixelWidth, CGDisplayModeGetPixelHeight
     from Quartz import CGWindowListCreateImage, kCGWindowListOptionOnScreenOnly, kCGNullWindowID
     import Quartz.CoreGraphics as CG
     _QUARTZ_AVAILABLE = True
 except ImportError:
     _QUARTZ_AVAILABLE = False
 
+# AppKit lets us query the frontmost app in-process instead of forking osascript
+try:
+    from AppKit import NSWorkspace, NSPasteboard, NSPasteboardTypeString
+    _APPKIT_AVAILABLE = True
+except ImportError:
+    _APPKIT_AVAILABLE = False
+
+# In-process audio playback - skips the fork/exec + CoreAudio setup of afplay
+try:
+    from AVFoundation import AVAudioPlayer
+    from Foundation import NSURL
+    _AVFOUNDATION_AVAILABLE = True
+except ImportError:
+    _AVFOUNDATION_AVAILABLE = False
+
+# Optional Numba JIT for trajectory generation - falls back to the NumPy path
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+if _NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _bezier_path_numba(start_x, start_y, end_x, end_y, steps):
+        """Compiled smoothstep + quadratic-Bezier sampler returning an int32 path."""
+        out = np.empty((steps + 1, 2), np.int32)
+        control_x = (start_x + end_x) / 2 + (end_y - start_y) * 0.1
+        control_y = (start_y + end_y) / 2 - (end_x - start_x) * 0.1
+        for i in range(steps + 1):
+            t = i / steps
+            ts = t * t * (3 - 2 * t)
+            om = 1.0 - ts
+            out[i, 0] = int(om * om * start_x + 2 * om * ts * control_x + ts * ts * end_x)
+            out[i, 1] = int(om * om * start_y + 2 * om * ts * control_y + ts * ts * end_y)
+        return out
+
+# Keyboard maps hoisted to module level so the typing hot paths never rebuild dicts
+_KEY_CODES = {
+    'space': 49, 'return': 36, 'enter': 36, 'tab': 48,
+    'a': 0, 'b': 11, 'c': 8, 'd': 2, 'e': 14, 'f': 3, 'g': 5, 'h': 4, 'i': 34, 'j': 38,
+    'k': 40, 'l': 37, 'm': 46, 'n': 45, 'o': 31, 'p': 35, 'q': 12, 'r': 15, 's': 1,
+    't': 17, 'u': 32, 'v': 9, 'w': 13, 'x': 7, 'y': 16, 'z': 6,
+    '1': 18, '2': 19, '3': 20, '4': 21, '5': 23, '6': 22, '7': 26, '8': 28, '9': 25, '0': 29
+}
+
+# 128-entry (key_code, needs_shift) table indexed by ord(char); -1 means unmapped.
+# An O(1) list index per character instead of dict hashing + .lower() calls.
+_CHAR_TO_KEY = [(-1, False)] * 128
+
+def _build_char_table():
+    base_map = {
+        ' ': 49, 'a': 0, 'b': 11, 'c': 8, 'd': 2, 'e': 14, 'f': 3, 'g': 5, 'h': 4, 'i': 34, 'j': 38,
+        'k': 40, 'l': 37, 'm': 46, 'n': 45, 'o': 31, 'p': 35, 'q': 12, 'r': 15, 's': 1,
+        't': 17, 'u': 32, 'v': 9, 'w': 13, 'x': 7, 'y': 16, 'z': 6,
+        '1': 18, '2': 19, '3': 20, '4': 21, '5': 23, '6': 22, '7': 26, '8': 28, '9': 25, '0': 29,
+        '.': 47, '/': 44, '-': 27, '=': 24, ',': 43, ';': 41,
+        "'": 39, '[': 33, ']': 30, '\\': 42, '`': 50
+    }
+    for char, key_code in base_map.items():
+        _CHAR_TO_KEY[ord(char)] = (key_code, False)
+    # Uppercase letters are the shifted variant of the lowercase key
+    for char in 'abcdefghijklmnopqrstuvwxyz':
+        _CHAR_TO_KEY[ord(char.upper())] = (base_map[char], True)
+    # Shifted punctuation the old map couldn't type
+    _CHAR_TO_KEY[ord('(')] = (25, True)  # shift+9
+    _CHAR_TO_KEY[ord(')')] = (29, True)  # shift+0
+    _CHAR_TO_KEY[ord('+')] = (24, True)  # shift+=
+
+_build_char_table()
+
+# Compiled once: parses "See:/Think:/Action:" lines with optional ** wrapping
+_RESP_RE = re.compile(r'^\**\s*(See|Think|Action)\s*:\**\s*(.*)$', re.M | re.I)
+# Rate-limit retry hint in Gemini error strings
+_RETRY_RE = re.compile(r'Please retry in (\d+\.?\d*)s')
+# Action-argument extractors, compiled once instead of per call
+_COORDS_RE = re.compile(r'\(([0-9.]+),\s*([0-9.]+)\)')
+_QUOTED_RE = re.compile(r'"([^"]*)"')
+_PARENNUM_RE = re.compile(r'\((\d+)\)')
+
+# Canned TTS rationales for hotkeys - the text never changes, so it's a lookup
+_STATIC_REASONS = {
+    "cmd+space": "Opening Spotlight.",
+    "cmd+t": "Opening new tab.",
+    "enter": "Pressing Enter.",
+    "return": "Pressing Enter.",
+    "cmd+l": "Focusing address bar.",
+}
+
+# (substring of the See line, phrase) pairs for narrating click targets;
+# order encodes priority
+_CLICK_TARGETS = (
+    ("compose", "Clicking compose button."),
+    ("subject", "Clicking subject field."),
+    ("message", "Clicking message body."),
+    ("body", "Clicking message body."),
+    ("button", "Clicking button."),
+    ("icon", "Clicking icon."),
+)
+
+# Built once at import - only the task line changes between think() calls,
+# so there is no reason to re-assemble ~2 KB of constant prompt per step
+_THINK_PROMPT_TEMPLATE = """You are Harvey, an intelligent macOS assistant. Your job is to break down a user's task into logical steps and choose the best tool for each step.
+
+TASK: {task}
+
+---
+## Tool Hierarchy: High-Level First
+
+You have two types of tools: high-level workflows and low-level actions.
+**ALWAYS prefer a high-level tool if it perfectly matches the user's goal.** Only use low-level actions for tasks that the high-level tools can't handle.
+
+---
+## High-Level Tools (Your Preferred Tools)
+
+-   `open_app("App Name")`: Use this to open any application (e.g., "System Settings", "Notes", "Safari"). This is the ONLY reliable way to open apps.
+-   `web_search("Search Term")`: Use this to perform a web search. This tool automatically handles opening Safari, making a new tab, typing, and searching.
+
+## Low-Level Tools (For Custom Actions)
+
+-   `left_click(ratio_x, ratio_y)`: To click buttons, links, etc.
+-   `type_text("text to type")`: To type inside an already-focused text field.
+-   `hotkey("modifier+key")`: For shortcuts like "cmd+w" to close a window.
+-   `scroll("direction")`: To scroll the active window.
+-   `done()`: When the entire task is complete.
+
+---
+## Your Logic: See -> Think -> Act
+
+1.  **See:** Describe the screen.
+2.  **Think:** Analyze the user's overall goal. Determine the very next sub-task. Choose the best tool (`open_app`, `web_search`, `left_click`, etc.) for that specific sub-task.
+3.  **Action:** State the single command to execute.
+
+---
+## Example Plan
+
+**TASK:** "open system settings using spot light and then move mouse to search bar to search for large text"
+
+**Correct Thought Process:**
+1.  **See:** Desktop.
+2.  **Think:** The first sub-task is to open "System Settings". The high-level tool `open_app` is perfect for this.
+3.  **Action:** `open_app("System Settings")`
+
+*(After that action runs, the code will take a new screenshot showing System Settings is open)*
+
+4.  **See:** System Settings window is open.
+5.  **Think:** The first part of the task is done. The next sub-task is to move the mouse to the search bar. This is a custom action, so I need a low-level tool. I see the search bar at the top of the window. I will use `left_click` to focus it.
+6.  **Action:** `left_click(0.45, 0.12)`
+
+---
+## Your Response Format
+
+See: [description of screen]
+Think: [your reasoning and tool choice]
+Action: [command]"""
+
+# Debug logging (verbose per-event prints on the hot paths)
+_DEBUG = os.getenv("HARVEY_DEBUG", "0") in ("1", "true", "True")
+
+# Log verbosity: 0 = quiet, 1 = step summaries (default), 2 = per-move detail.
+# Terminal writes flush under the stdout lock, so hot-path prints are not free.
+try:
+    _LOG = int(os.getenv("HARVEY_LOG", "1"))
+except ValueError:
+    _LOG = 1
+
+# Re-query the cursor after moves to detect drift (extra CGEvent round-trips)
+_VERIFY_DRIFT = os.getenv("HARVEY_VERIFY_DRIFT", "0") in ("1", "true", "True")
+
+# Seconds between typed characters - the event tap tolerates far less than the
+# old 0.05s/char, but leave it tunable for apps with slow input handling
+try:
+    _TYPE_INTERVAL = float(os.getenv("HARVEY_TYPE_INTERVAL", "0.015"))
+except ValueError:
+    _TYPE_INTERVAL = 0.015
+
+# Optional per-line pause for the bulk-type fallback - the WindowServer
+# queues the events, so most targets need none
+try:
+    _LINE_DELAY = float(os.getenv("HARVEY_LINE_DELAY_MS", "0")) / 1000.0
+except ValueError:
+    _LINE_DELAY = 0.0
+
 # Mouse trail configuration
 _MOUSE_TRAIL_ENABLED = os.getenv("HARVEY_MOUSE_TRAIL", "1") in ("1", "true", "True")
-_TRAIL_POINTS = []  # Store recent mouse positions
 _MAX_TRAIL_POINTS = 15  # Maximum trail points to keep
 _TRAIL_FADE_SPEED = 0.8  # How quickly trail points fade
 
+# Trail state as parallel fixed-size arrays (a ring buffer) instead of a list of
+# dicts - constant memory, vectorized fades, no per-point rebuilds
+_TRAIL_X = np.zeros(_MAX_TRAIL_POINTS, dtype=np.int32)
+_TRAIL_Y = np.zeros(_MAX_TRAIL_POINTS, dtype=np.int32)
+_TRAIL_OP = np.zeros(_MAX_TRAIL_POINTS, dtype=np.float32)  # opacity
+_TRAIL_SZ = np.zeros(_MAX_TRAIL_POINTS, dtype=np.float32)  # point size
+_TRAIL_HEAD = 0  # next slot to write
+_TRAIL_COUNT = 0  # points written so far, capped at _MAX_TRAIL_POINTS
+
+# Cached display geometry - queried once, reused by every coordinate transform.
+# Invalidated by the display-reconfiguration callback below rather than polled.
+_SCREEN_INFO_CACHE = None
+_DISPLAY_CALLBACK_REGISTERED = False
+_DISPLAY_RECONFIG_CB = None  # kept referenced so the callback isn't collected
+
+def _register_display_callback():
+    """Invalidate the screen-info cache when the display configuration changes."""
+    global _DISPLAY_CALLBACK_REGISTERED, _DISPLAY_RECONFIG_CB
+    if _DISPLAY_CALLBACK_REGISTERED or not _QUARTZ_AVAILABLE:
+        return
+    _DISPLAY_CALLBACK_REGISTERED = True
+    try:
+        from Quartz import CGDisplayRegisterReconfigurationCallback
+
+        def _on_display_change(display, flags, user_info):
+            global _SCREEN_INFO_CACHE
+            _SCREEN_INFO_CACHE = None
+
+        CGDisplayRegisterReconfigurationCallback(_on_display_change, None)
+        _DISPLAY_RECONFIG_CB = _on_display_change
+    except Exception:
+        # Without the callback the cache just stays valid for the process lifetime
+        pass
+
+# Reusable CGEvent objects - skip a CoreFoundation alloc + PyObjC wrap per post
+_MOUSE_MOVE_EVENT = None
+_KEY_EVENT_CACHE = {}  # (key_code, is_down) -> cached keyboard event
+
+def _get_mouse_move_event():
+    """Return the shared mouse-moved event; callers update it with CGEventSetLocation."""
+    global _MOUSE_MOVE_EVENT
+    if _MOUSE_MOVE_EVENT is None:
+        _MOUSE_MOVE_EVENT = CGEventCreateMouseEvent(None, kCGEventMouseMoved, (0, 0), 0)
+    return _MOUSE_MOVE_EVENT
+
+def _get_key_event(key_code, is_down):
+    """Return a cached keyboard event for key_code, with stale modifier flags cleared."""
+    event = _KEY_EVENT_CACHE.get((key_code, is_down))
+    if event is None:
+        event = CGEventCreateKeyboardEvent(None, key_code, is_down)
+        _KEY_EVENT_CACHE[(key_code, is_down)] = event
+    else:
+        CGEventSetFlags(event, 0)  # reset flags left over from the previous use
+    return event
+
 def get_screen_info():
     """Get screen size in points and pixels to determine the exact scaling factor."""
-    if _QUARTZ_AVAILABLE:
-        from Quartz.CoreGraphics import (
-            CGMainDisplayID,
-            CGDisplayBounds,
-            CGDisplayCopyDisplayMode,
-            CGDisplayModeGetPixelWidth,
-            CGDisplayModeGetPixelHeight,
-        )
+    global _SCREEN_INFO_CACHE
+    if _SCREEN_INFO_CACHE is not None:
+        return _SCREEN_INFO_CACHE
 
+    if _QUARTZ_AVAILABLE:
         display_id = CGMainDisplayID()
 
         # Logical dimensions (points)
@@ -63,9 +304,12 @@ def get_screen_info():
         scale = (pixel_width / logical_width) if logical_width else 1.0
 
         # Return logical size for event coordinates, plus scale for diagnostics
-        return logical_width, logical_height, scale
-    # Fallback for non-macOS systems
-    return 1920, 1080, 1.0
+        _SCREEN_INFO_CACHE = (logical_width, logical_height, scale)
+        _register_display_callback()
+    else:
+        # Fallback for non-macOS systems
+        _SCREEN_INFO_CACHE = (1920, 1080, 1.0)
+    return _SCREEN_INFO_CACHE
 
 def get_screen_size():
     """Get screen size (for backward compatibility)."""
@@ -76,58 +320,70 @@ def _transform_coords(x_ratio, y_ratio):
     """Transform ratios (top-left origin) to Quartz screen coordinates (top-left origin)."""
     width, height, scale = get_screen_info()
 
-    # Clamp ratios
-    x_ratio = max(0.0, min(1.0, float(x_ratio)))
-    y_ratio = max(0.0, min(1.0, float(y_ratio)))
+    # Clamp ratios - ternaries skip the tuple allocation inside max()/min()
+    x_ratio = 0.0 if x_ratio < 0.0 else (1.0 if x_ratio > 1.0 else float(x_ratio))
+    y_ratio = 0.0 if y_ratio < 0.0 else (1.0 if y_ratio > 1.0 else float(y_ratio))
 
     # Convert to points (no Y flip; CGEvent global coords use top-left origin)
-    x = int(round(x_ratio * (width - 1)))
-    y = int(round(y_ratio * (height - 1)))
+    x = int(x_ratio * (width - 1) + 0.5)
+    y = int(y_ratio * (height - 1) + 0.5)
 
-    print(f"🎯 Ratio ({x_ratio:.3f}, {y_ratio:.3f}) -> Screen ({x}, {y}) [Points: {width}x{height}, Scale: {scale:.1f}x]")
+    if _DEBUG:
+        print(f"🎯 Ratio ({x_ratio:.3f}, {y_ratio:.3f}) -> Screen ({x}, {y}) [Points: {width}x{height}, Scale: {scale:.1f}x]")
     return x, y
 
 def _add_trail_point(x, y):
-    """Add a point to the mouse trail."""
-    global _TRAIL_POINTS
+    """Add a point to the mouse trail ring buffer."""
+    global _TRAIL_HEAD, _TRAIL_COUNT
     if not _MOUSE_TRAIL_ENABLED or not _QUARTZ_AVAILABLE:
         return
-    
-    # Add new point with full opacity
-    _TRAIL_POINTS.append({'x': x, 'y': y, 'opacity': 1.0, 'size': 8})
-    
-    # Remove old points and fade existing ones
-    _TRAIL_POINTS = [p for p in _TRAIL_POINTS if p['opacity'] > 0.1]
-    if len(_TRAIL_POINTS) > _MAX_TRAIL_POINTS:
-        _TRAIL_POINTS = _TRAIL_POINTS[-_MAX_TRAIL_POINTS:]
-    
-    # Fade existing points
-    for point in _TRAIL_POINTS[:-1]:  # Don't fade the newest point
-        point['opacity'] *= _TRAIL_FADE_SPEED
-        point['size'] *= 0.95
+
+    # Fade everything already in the buffer (one vectorized multiply), then
+    # write the new point at the head slot with full opacity
+    _TRAIL_OP *= _TRAIL_FADE_SPEED
+    _TRAIL_SZ *= 0.95
+
+    _TRAIL_X[_TRAIL_HEAD] = x
+    _TRAIL_Y[_TRAIL_HEAD] = y
+    _TRAIL_OP[_TRAIL_HEAD] = 1.0
+    _TRAIL_SZ[_TRAIL_HEAD] = 8.0
+    _TRAIL_HEAD = (_TRAIL_HEAD + 1) % _MAX_TRAIL_POINTS
+    if _TRAIL_COUNT < _MAX_TRAIL_POINTS:
+        _TRAIL_COUNT += 1
+
+def _add_trail_points_batch(xs, ys):
+    """Record a whole movement path in the trail with a single fade pass."""
+    global _TRAIL_HEAD, _TRAIL_COUNT
+    if not _MOUSE_TRAIL_ENABLED or not _QUARTZ_AVAILABLE:
+        return
+
+    n = min(len(xs), _MAX_TRAIL_POINTS)
+    if n == 0:
+        return
+
+    # One fade for the whole move instead of one per interpolation step
+    _TRAIL_OP *= _TRAIL_FADE_SPEED
+    _TRAIL_SZ *= 0.95
+
+    idx = (_TRAIL_HEAD + np.arange(n)) % _MAX_TRAIL_POINTS
+    _TRAIL_X[idx] = xs[-n:]
+    _TRAIL_Y[idx] = ys[-n:]
+    # Later path points enter brighter, mimicking the per-step fade ordering
+    _TRAIL_OP[idx] = np.linspace(_TRAIL_FADE_SPEED, 1.0, n)
+    _TRAIL_SZ[idx] = 8.0
+    _TRAIL_HEAD = int((_TRAIL_HEAD + n) % _MAX_TRAIL_POINTS)
+    _TRAIL_COUNT = min(_TRAIL_COUNT + n, _MAX_TRAIL_POINTS)
+
+# Terminal trail logging is debug-only - it runs after every mouse move
+_DEBUG_TRAIL = os.getenv("HARVEY_DEBUG_TRAIL", "0") in ("1", "true", "True")
 
 def _draw_trail_overlay():
-    """Draw the mouse trail overlay on screen using a simple visual method."""
-    if not _MOUSE_TRAIL_ENABLED or not _QUARTZ_AVAILABLE or not _TRAIL_POINTS:
+    """Log the newest trail point to the terminal (there is no on-screen overlay)."""
+    if not _DEBUG_TRAIL or _TRAIL_COUNT == 0:
         return
-    
-    try:
-        # Use AppleScript to create a simple visual indicator
-        # This is a lightweight approach that doesn't require complex graphics context
-        script = f'''
-        tell application "System Events"
-            -- Create a brief visual flash at the current mouse position
-            set mousePos to (current application's NSEvent's mouseLocation() as record)
-        end tell
-        '''
-        
-        # For now, we'll use a simpler approach - just add visual feedback via terminal
-        if len(_TRAIL_POINTS) > 1:
-            latest = _TRAIL_POINTS[-1]
-            print(f"🐭 Trail: ({latest['x']}, {latest['y']}) [{len(_TRAIL_POINTS)} points]")
-    except Exception as e:
-        # Trail drawing is optional, don't break automation if it fails
-        pass
+    newest = (_TRAIL_HEAD - 1) % _MAX_TRAIL_POINTS
+    visible = int((_TRAIL_OP > 0.1).sum())
+    print(f"🐭 Trail: ({_TRAIL_X[newest]}, {_TRAIL_Y[newest]}) [{visible} points]")
 
 def get_current_mouse_position():
     if _QUARTZ_AVAILABLE:
@@ -138,35 +394,123 @@ def get_current_mouse_position():
         return x, y
     return 100, 100
 
+def _bezier_path(start_x, start_y, end_x, end_y, steps):
+    """Generate the smoothstep-eased quadratic-Bezier path as int32 coordinate arrays."""
+    if _NUMBA_AVAILABLE:
+        path = _bezier_path_numba(float(start_x), float(start_y), float(end_x), float(end_y), steps)
+        return path[:, 0], path[:, 1]
+
+    # Vectorized evaluation: one C-level pass over all steps instead of
+    # interpreting the easing/curve math per iteration
+    t = np.linspace(0.0, 1.0, steps + 1)
+    t_smooth = t * t * (3 - 2 * t)  # smoothstep easing
+    one_minus = 1.0 - t_smooth
+
+    control_x = (start_x + end_x) / 2 + (end_y - start_y) * 0.1
+    control_y = (start_y + end_y) / 2 - (end_x - start_x) * 0.1
+
+    xs = (one_minus ** 2 * start_x + 2 * one_minus * t_smooth * control_x + t_smooth ** 2 * end_x).astype(np.int32)
+    ys = (one_minus ** 2 * start_y + 2 * one_minus * t_smooth * control_y + t_smooth ** 2 * end_y).astype(np.int32)
+    return xs, ys
+
 def smooth_move_mouse(start_x, start_y, end_x, end_y):
+    """Move the cursor along a smooth path; returns the final cursor position."""
     if not _QUARTZ_AVAILABLE:
-        return
-    distance = math.sqrt((end_x - start_x)**2 + (end_y - start_y)**2)
-    if distance < 5:
-        return
-    steps = max(10, int(distance / 15))
-    
-    print(f"🐭 Moving mouse from ({start_x}, {start_y}) to ({end_x}, {end_y}) in {steps} steps")
-    
-    for i in range(steps + 1):
-        t = i / steps
-        t_smooth = t * t * (3 - 2 * t)
+        return end_x, end_y
+    # Compare squared distance - no libm sqrt needed for the tolerance check
+    dx = end_x - start_x
+    dy = end_y - start_y
+    d2 = dx * dx + dy * dy
+    if d2 < 25:
+        # Already within click tolerance - nothing posted, cursor stays put
+        return start_x, start_y
+    steps = max(10, math.isqrt(int(d2)) // 15)
+
+    if _LOG >= 2:
+        print(f"🐭 Moving mouse from ({start_x}, {start_y}) to ({end_x}, {end_y}) in {steps} steps")
+
+    # Generate the full path up front, then post in a tight loop - the only
+    # per-step work left is the bridge crossing into CGEventPost itself
+    xs, ys = _bezier_path(start_x, start_y, end_x, end_y, steps)
+
+    # Record the whole path in the trail at once - one fade pass rather than
+    # a fade per interpolation step (O(N) instead of O(N^2))
+    _add_trail_points_batch(xs, ys)
+
+    # Iterate only for the event-posting side effects. Pace against absolute
+    # deadlines so sleep jitter doesn't accumulate into the move's duration.
+    event = _get_mouse_move_event()
+    t0 = time.monotonic()
+    for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist()), start=1):
+        CGEventSetLocation(event, (x, y))
+        CGEventPost(kCGHIDEventTap, event)
 
-        control_x = (start_x + end_x) / 2 + (end_y - start_y) * 0.1
-        control_y = (start_y + end_y) / 2 - (end_x - start_x) * 0.1
+        remaining = t0 + i * 0.01 - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
 
-        x = int((1 - t_smooth) ** 2 * start_x + 2 * (1 - t_smooth) * t_smooth * control_x + t_smooth ** 2 * end_x)
-        y = int((1 - t_smooth) ** 2 * start_y + 2 * (1 - t_smooth) * t_smooth * control_y + t_smooth ** 2 * end_y)
+    # Draw trail overlay after movement
+    _draw_trail_overlay()
 
-        # Add trail point for this movement
-        _add_trail_point(x, y)
-        
-        event = CGEventCreateMouseEvent(None, kCGEventMouseMoved, (x, y), 0)
+    # The last posted point is the destination - callers can trust this
+    return end_x, end_y
+
+def _catmull_rom_path(points, samples_per_segment=20):
+    """Sample a Catmull-Rom spline through the waypoints as int32 coordinate arrays."""
+    pts = np.asarray(points, dtype=np.float64)
+    # Duplicate the endpoints so the spline still interpolates them
+    pts = np.vstack([pts[0], pts, pts[-1]])
+    p0, p1, p2, p3 = pts[:-3], pts[1:-2], pts[2:-1], pts[3:]
+
+    t = np.linspace(0.0, 1.0, samples_per_segment, endpoint=False)
+    t2 = t * t
+    t3 = t2 * t
+    # Catmull-Rom basis with tangents 0.5*(p[i+1] - p[i-1])
+    b0 = -0.5 * t3 + t2 - 0.5 * t
+    b1 = 1.5 * t3 - 2.5 * t2 + 1.0
+    b2 = -1.5 * t3 + 2.0 * t2 + 0.5 * t
+    b3 = 0.5 * t3 - 0.5 * t2
+
+    # One vectorized evaluation over every segment at once
+    path = (p0[:, None, :] * b0[None, :, None] + p1[:, None, :] * b1[None, :, None] +
+            p2[:, None, :] * b2[None, :, None] + p3[:, None, :] * b3[None, :, None])
+    path = np.vstack([path.reshape(-1, 2), pts[-2]])  # land exactly on the last waypoint
+    return path[:, 0].astype(np.int32), path[:, 1].astype(np.int32)
+
+def move_path(points):
+    """Move the cursor through several waypoints as one continuous spline.
+
+    Unlike chained smooth_move_mouse calls, the trajectory stays continuous
+    in velocity across waypoints - no per-segment ramp-up and no position
+    re-query between segments. Returns the final cursor position.
+    """
+    if not points:
+        return get_current_mouse_position()
+    if not _QUARTZ_AVAILABLE:
+        return points[-1]
+
+    current_x, current_y = get_current_mouse_position()
+    if len(points) == 1:
+        return smooth_move_mouse(current_x, current_y, points[0][0], points[0][1])
+
+    xs, ys = _catmull_rom_path([(current_x, current_y)] + list(points))
+    _add_trail_points_batch(xs, ys)
+
+    if _LOG >= 2:
+        print(f"🐭 Moving mouse through {len(points)} waypoints ({len(xs)} samples)")
+
+    event = _get_mouse_move_event()
+    t0 = time.monotonic()
+    for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist()), start=1):
+        CGEventSetLocation(event, (x, y))
         CGEventPost(kCGHIDEventTap, event)
-        time.sleep(0.01)
-    
-    # Draw trail overlay after movement
+
+        remaining = t0 + i * 0.01 - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
     _draw_trail_overlay()
+    return points[-1]
 
 def move_mouse(x_ratio, y_ratio):
     if not _QUARTZ_AVAILABLE:
@@ -175,14 +519,55 @@ def move_mouse(x_ratio, y_ratio):
     current_x, current_y = get_current_mouse_position()
     smooth_move_mouse(current_x, current_y, x, y)
 
+# Frontmost-app name cache so rapid successive clicks don't re-query the OS
+_FRONTMOST_CACHE = {'name': None, 'at': 0.0}
+
+def _get_frontmost_app_name():
+    """Return the frontmost application's name, cached for ~100ms."""
+    now = time.monotonic()
+    if now - _FRONTMOST_CACHE['at'] < 0.1:
+        return _FRONTMOST_CACHE['name']
+
+    name = None
+    if _APPKIT_AVAILABLE:
+        try:
+            app = NSWorkspace.sharedWorkspace().frontmostApplication()
+            name = str(app.localizedName()) if app else None
+        except Exception:
+            name = None
+
+    if name is None:
+        # Fallback: fork osascript (slow - only used when AppKit is unavailable)
+        try:
+            result = subprocess.run(['osascript', '-e', 'tell application "System Events" to get name of first process whose frontmost is true'],
+                                  capture_output=True, text=True, check=True)
+            name = result.stdout.strip()
+        except:
+            name = None
+
+    _FRONTMOST_CACHE['name'] = name
+    _FRONTMOST_CACHE['at'] = now
+    return name
+
 def _is_spotlight_active():
-    try:
-        result = subprocess.run(['osascript', '-e', 'tell application "System Events" to get name of first process whose frontmost is true'], 
-                              capture_output=True, text=True, check=True)
-        frontmost = result.stdout.strip()
-        return frontmost == "Spotlight" or "Spotlight" in frontmost
-    except:
-        return False
+    frontmost = _get_frontmost_app_name()
+    return bool(frontmost) and "Spotlight" in frontmost
+
+def _wait_until(predicate, timeout, interval=0.05):
+    """Poll predicate until it returns True or timeout elapses.
+
+    Returns True as soon as the predicate holds, so callers pay only as much
+    of the timeout as the UI actually needs - it's a ceiling, not a fixed cost.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if predicate():
+                return True
+        except Exception:
+            pass
+        time.sleep(interval)
+    return False
 
 def _handle_spotlight_click(x_ratio, y_ratio):
     print("🔍 Spotlight: Using Enter to select first result (simplest path)")
@@ -201,23 +586,17 @@ def _write_env_offsets(offset_x: int, offset_y: int) -> bool:
     """Create or update .env with HARVEY_X_OFFSET/Y_OFFSET values."""
     try:
         env_path = Path(".env")
-        lines = []
-        if env_path.exists():
-            lines = env_path.read_text().splitlines()
-
-        def set_or_replace(lines, key, value):
-            found = False
-            for i, line in enumerate(lines):
-                if line.strip().startswith(f"{key}="):
-                    lines[i] = f"{key}={value}"
-                    found = True
-                    break
-            if not found:
-                lines.append(f"{key}={value}")
-            return lines
-
-        lines = set_or_replace(lines, "HARVEY_X_OFFSET", str(int(offset_x)))
-        lines = set_or_replace(lines, "HARVEY_Y_OFFSET", str(int(offset_y)))
+        lines = env_path.read_text().splitlines() if env_path.exists() else []
+
+        # Single pass: replace existing keys in place, append whatever is left.
+        # Comments and unrelated lines pass through untouched.
+        updates = {"HARVEY_X_OFFSET": str(int(offset_x)), "HARVEY_Y_OFFSET": str(int(offset_y))}
+        for i, line in enumerate(lines):
+            key = line.split("=", 1)[0].strip()
+            if key in updates:
+                lines[i] = f"{key}={updates.pop(key)}"
+        for key, value in updates.items():
+            lines.append(f"{key}={value}")
 
         # Ensure trailing newline
         env_path.write_text("\n".join(lines) + "\n")
@@ -228,8 +607,11 @@ def _write_env_offsets(offset_x: int, offset_y: int) -> bool:
 
 def clear_mouse_trail():
     """Clear the mouse trail."""
-    global _TRAIL_POINTS
-    _TRAIL_POINTS = []
+    global _TRAIL_HEAD, _TRAIL_COUNT
+    _TRAIL_OP[:] = 0.0
+    _TRAIL_SZ[:] = 0.0
+    _TRAIL_HEAD = 0
+    _TRAIL_COUNT = 0
     print("🐭 Mouse trail cleared")
 
 def calibrate_interactive():
@@ -289,24 +671,25 @@ def ultra_precise_click(x_ratio, y_ratio):
     x, y = _transform_coords(x_ratio, y_ratio)
     x, y = calibrate_click_position(x, y)
     
-    print(f"🎯 Ultra-precise clicking at ({x}, {y})")
+    if _LOG >= 2:
+        print(f"🎯 Ultra-precise clicking at ({x}, {y})")
     
-    # Move to position with higher precision
+    # Move to position with higher precision; the returned coords are where
+    # the last move event landed, so no re-query is needed
     current_x, current_y = get_current_mouse_position()
-    smooth_move_mouse(current_x, current_y, x, y)
+    click_x, click_y = smooth_move_mouse(current_x, current_y, x, y)
     time.sleep(0.15)  # Slightly longer pause for precision
-    
-    # Verify we're at the right position and DON'T move again if close enough
-    final_x, final_y = get_current_mouse_position()
-    if abs(final_x - x) > 5 or abs(final_y - y) > 5:  # Increased tolerance
-        print(f"⚠️  Position drift detected: expected ({x}, {y}), got ({final_x}, {final_y})")
-        # Only correct if drift is significant
-        smooth_move_mouse(final_x, final_y, x, y)
-        time.sleep(0.05)  # Shorter wait
-    
-    # Get final position for click event
-    click_x, click_y = get_current_mouse_position()
-    
+
+    # Optional drift verification - costs extra CGEvent round-trips per click
+    if _VERIFY_DRIFT:
+        final_x, final_y = get_current_mouse_position()
+        if abs(final_x - x) > 5 or abs(final_y - y) > 5:  # Increased tolerance
+            print(f"⚠️  Position drift detected: expected ({x}, {y}), got ({final_x}, {final_y})")
+            # Only correct if drift is significant
+            click_x, click_y = smooth_move_mouse(final_x, final_y, x, y)
+            time.sleep(0.05)  # Shorter wait
+
+
     # Perform the click with error handling
     try:
         down_event = CGEventCreateMouseEvent(None, kCGEventLeftMouseDown, (click_x, click_y), 0)
@@ -316,7 +699,8 @@ def ultra_precise_click(x_ratio, y_ratio):
         time.sleep(0.05)
         CGEventPost(kCGHIDEventTap, up_event)
         
-        print(f"✅ Ultra-precise click completed at ({click_x}, {click_y})")
+        if _LOG:
+            print(f"✅ Ultra-precise click completed at ({click_x}, {click_y})")
     except Exception as e:
         print(f"❌ Click failed: {e}")
 
@@ -339,20 +723,23 @@ def double_click(x_ratio, y_ratio):
     x, y = _transform_coords(x_ratio, y_ratio)
     x, y = calibrate_click_position(x, y)
     
-    print(f"⚡ Ultra-precise double-clicking at ({x}, {y})")
+    if _LOG >= 2:
+        print(f"⚡ Ultra-precise double-clicking at ({x}, {y})")
     
     # Move to position with precision
     current_x, current_y = get_current_mouse_position()
     smooth_move_mouse(current_x, current_y, x, y)
     time.sleep(0.2)
-    
-    # Verify position
-    final_x, final_y = get_current_mouse_position()
-    if abs(final_x - x) > 2 or abs(final_y - y) > 2:
-        print(f"⚠️  Position correction for double-click")
-        smooth_move_mouse(final_x, final_y, x, y)
-        time.sleep(0.1)
-    
+
+    # Optional drift verification before the double-click
+    if _VERIFY_DRIFT:
+        final_x, final_y = get_current_mouse_position()
+        if abs(final_x - x) > 2 or abs(final_y - y) > 2:
+            print(f"⚠️  Position correction for double-click")
+            smooth_move_mouse(final_x, final_y, x, y)
+            time.sleep(0.1)
+
+
     # Perform double-click
     try:
         for _ in range(2):
@@ -362,7 +749,8 @@ def double_click(x_ratio, y_ratio):
             time.sleep(0.05)
             CGEventPost(kCGHIDEventTap, up_event)
             time.sleep(0.1)  # Brief pause between clicks
-        print(f"⚡ Ultra-precise double-click completed at ({x}, {y})")
+        if _LOG:
+            print(f"⚡ Ultra-precise double-click completed at ({x}, {y})")
     except Exception as e:
         print(f"❌ Double-click failed: {e}")
 
@@ -374,60 +762,54 @@ def hover(x_ratio, y_ratio):
         return
     
     x, y = _transform_coords(x_ratio, y_ratio)
-    print(f"👆 Hovering at ({x}, {y})")
-    
+    if _LOG >= 2:
+        print(f"👆 Hovering at ({x}, {y})")
+
     current_x, current_y = get_current_mouse_position()
     smooth_move_mouse(current_x, current_y, x, y)
     time.sleep(0.5)  # Hold position for hover effects
-    print(f"✅ Hover completed at ({x}, {y})")
+    if _LOG:
+        print(f"✅ Hover completed at ({x}, {y})")
 
 def type_text(text):
     if not _QUARTZ_AVAILABLE:
         print(f"⌨️ Typed: {text} (simulated)")
         return
         
-    print(f"⌨️ Typing: {text}")
-    
-    key_map = {
-        ' ': 49, 'a': 0, 'b': 11, 'c': 8, 'd': 2, 'e': 14, 'f': 3, 'g': 5, 'h': 4, 'i': 34, 'j': 38,
-        'k': 40, 'l': 37, 'm': 46, 'n': 45, 'o': 31, 'p': 35, 'q': 12, 'r': 15, 's': 1,
-        't': 17, 'u': 32, 'v': 9, 'w': 13, 'x': 7, 'y': 16, 'z': 6,
-        '1': 18, '2': 19, '3': 20, '4': 21, '5': 23, '6': 22, '7': 26, '8': 28, '9': 25, '0': 29,
-        '.': 47, '/': 44, '-': 27, '=': 24, ',': 43, '(': None, ')': None, '+': None, ';': 41,
-        "'": 39, '[': 33, ']': 30, '\\': 42, '`': 50
-    }
-    
+    if _LOG:
+        print(f"⌨️ Typing: {text}")
+
+    # Resolve every character up front so unmapped ones are reported once
+    # instead of mid-stream between key events
+    key_specs = []
     for char in text:
-        char_lower = char.lower()
-        if char_lower in key_map:
-            key_code = key_map[char_lower]
-            
-            # Skip characters that can't be typed directly
-            if key_code is None:
-                print(f"⌨️ Skipping unsupported character '{char}'")
-                continue
-            
-            try:
-                down = CGEventCreateKeyboardEvent(None, key_code, True)
-                up = CGEventCreateKeyboardEvent(None, key_code, False)
-                
-                # Only apply shift for actual uppercase letters, not for typing in general
-                if char.isupper() and char.isalpha():
-                    CGEventSetFlags(down, 131072)  # shift flag only for caps
-                    CGEventSetFlags(up, 0)  # clear flags on release
-                else:
-                    CGEventSetFlags(down, 0)  # no flags for lowercase
-                    CGEventSetFlags(up, 0)
-                    
-                CGEventPost(kCGHIDEventTap, down)
-                time.sleep(0.02)
-                CGEventPost(kCGHIDEventTap, up)
-                time.sleep(0.03)
-            except Exception as e:
-                print(f"⌨️ Error typing '{char}': {e}")
+        code_point = ord(char)
+        key_code, needs_shift = _CHAR_TO_KEY[code_point] if code_point < 128 else (-1, False)
+        if key_code >= 0:
+            key_specs.append((char, key_code, needs_shift))
         else:
             print(f"⌨️ Character '{char}' not mapped")
-        time.sleep(0.02)
+
+    # Post down/up back-to-back and pace against one global deadline rather
+    # than three fixed sleeps per character - sleep jitter no longer stacks
+    t0 = time.monotonic()
+    for i, (char, key_code, needs_shift) in enumerate(key_specs, start=1):
+        try:
+            down = _get_key_event(key_code, True)
+            up = _get_key_event(key_code, False)
+
+            # Shift only where the character actually requires it
+            CGEventSetFlags(down, 131072 if needs_shift else 0)  # shift flag
+            CGEventSetFlags(up, 0)  # clear flags on release
+
+            CGEventPost(kCGHIDEventTap, down)
+            CGEventPost(kCGHIDEventTap, up)
+        except Exception as e:
+            print(f"⌨️ Error typing '{char}': {e}")
+
+        remaining = t0 + i * _TYPE_INTERVAL - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
 
 def scroll(direction, clicks=5):
     """Scroll the mouse wheel up, down, left, or right using a true scroll event."""
@@ -444,11 +826,13 @@ def scroll(direction, clicks=5):
         return
 
     vertical, horizontal = scroll_direction[direction.lower()]
-    print(f"📜 Scrolling {direction}...")
+    if _LOG >= 2:
+        print(f"📜 Scrolling {direction}...")
     try:
         scroll_event = CGEventCreateScrollWheelEvent(None, kCGScrollEventUnitLine, 2, vertical, horizontal)
         CGEventPost(kCGHIDEventTap, scroll_event)
-        print(f"✅ Scrolled {direction}")
+        if _LOG:
+            print(f"✅ Scrolled {direction}")
     except Exception as e:
         print(f"❌ Scroll failed: {e}")
 
@@ -456,15 +840,9 @@ def hotkey(key_combo):
     if not _QUARTZ_AVAILABLE:
         print(f"🔥 Hotkey: {key_combo} (simulated)")
         return
-        
-    key_codes = {
-        'space': 49, 'return': 36, 'enter': 36, 'tab': 48,
-        'a': 0, 'b': 11, 'c': 8, 'd': 2, 'e': 14, 'f': 3, 'g': 5, 'h': 4, 'i': 34, 'j': 38,
-        'k': 40, 'l': 37, 'm': 46, 'n': 45, 'o': 31, 'p': 35, 'q': 12, 'r': 15, 's': 1,
-        't': 17, 'u': 32, 'v': 9, 'w': 13, 'x': 7, 'y': 16, 'z': 6,
-        '1': 18, '2': 19, '3': 20, '4': 21, '5': 23, '6': 22, '7': 26, '8': 28, '9': 25, '0': 29
-    }
-    
+
+    key_codes = _KEY_CODES
+
     try:
         if "+" in key_combo:
             parts = key_combo.split("+")
@@ -473,10 +851,10 @@ def hotkey(key_combo):
             
             if key in key_codes:
                 key_code = key_codes[key]
-                
-                down = CGEventCreateKeyboardEvent(None, key_code, True)
-                up = CGEventCreateKeyboardEvent(None, key_code, False)
-                
+
+                down = _get_key_event(key_code, True)
+                up = _get_key_event(key_code, False)
+
                 flags = 0
                 if "cmd" in modifiers or "command" in modifiers:
                     flags |= kCGEventFlagMaskCommand
@@ -499,8 +877,8 @@ def hotkey(key_combo):
                 print(f"🔥 Hotkey: {key_combo} (key not mapped)")
         elif key_combo.lower() in key_codes:
             key_code = key_codes[key_combo.lower()]
-            down = CGEventCreateKeyboardEvent(None, key_code, True)
-            up = CGEventCreateKeyboardEvent(None, key_code, False)
+            down = _get_key_event(key_code, True)
+            up = _get_key_event(key_code, False)
             CGEventPost(kCGHIDEventTap, down)
             time.sleep(0.02)
             CGEventPost(kCGHIDEventTap, up)
@@ -518,72 +896,47 @@ class Harvey:
         self.bulk_typing_mode = False
         self.pending_text = []
         self.last_environment = ""
-        
-    def think(self, task, screenshot_data):
-        prompt = f"""You are Harvey, an intelligent macOS assistant. Your job is to break down a user's task into logical steps and choose the best tool for each step.
-
-TASK: {task}
-
----
-## Tool Hierarchy: High-Level First
-
-You have two types of tools: high-level workflows and low-level actions.
-**ALWAYS prefer a high-level tool if it perfectly matches the user's goal.** Only use low-level actions for tasks that the high-level tools can't handle.
-
----
-## High-Level Tools (Your Preferred Tools)
-
--   `open_app("App Name")`: Use this to open any application (e.g., "System Settings", "Notes", "Safari"). This is the ONLY reliable way to open apps.
--   `web_search("Search Term")`: Use this to perform a web search. This tool automatically handles opening Safari, making a new tab, typing, and searching.
-
-## Low-Level Tools (For Custom Actions)
-
--   `left_click(ratio_x, ratio_y)`: To click buttons, links, etc.
--   `type_text("text to type")`: To type inside an already-focused text field.
--   `hotkey("modifier+key")`: For shortcuts like "cmd+w" to close a window.
--   `scroll("direction")`: To scroll the active window.
--   `done()`: When the entire task is complete.
-
----
-## Your Logic: See -> Think -> Act
-
-1.  **See:** Describe the screen.
-2.  **Think:** Analyze the user's overall goal. Determine the very next sub-task. Choose the best tool (`open_app`, `web_search`, `left_click`, etc.) for that specific sub-task.
-3.  **Action:** State the single command to execute.
-
----
-## Example Plan
-
-**TASK:** "open system settings using spot light and then move mouse to search bar to search for large text"
-
-**Correct Thought Process:**
-1.  **See:** Desktop.
-2.  **Think:** The first sub-task is to open "System Settings". The high-level tool `open_app` is perfect for this.
-3.  **Action:** `open_app("System Settings")`
+        # Read once so the step loop pays a single attribute check
+        self._debug = _DEBUG
+        # Frame-skip state: hash of the last frame sent to the model, and how
+        # many identical frames in a row we've skipped
+        self._last_hash = None
+        self._skipped_frames = 0
+        # Screen geometry is stable for the session (the module-level cache
+        # handles display reconfiguration) - grab it once up front
+        self._screen_w, self._screen_h, self._screen_scale = get_screen_info()
+        # Content-addressed TTS cache: repeat phrases skip the TTS API
+        self._tts_cache_dir = Path("~/.harvey/tts_cache").expanduser()
+        self._tts_memo = {}
+        # Single audio worker so speech never blocks the step loop
+        self._tts_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._last_audio_proc = None
+        # Keep the active AVAudioPlayer referenced so GC can't reap it mid-clip
+        self._current_player = None
+        # Prepared players per clip - replaying a canned phrase rewinds a warm
+        # player instead of rebuilding the audio graph from the file
+        self._player_cache = {}
 
-*(After that action runs, the code will take a new screenshot showing System Settings is open)*
-
-4.  **See:** System Settings window is open.
-5.  **Think:** The first part of the task is done. The next sub-task is to move the mouse to the search bar. This is a custom action, so I need a low-level tool. I see the search bar at the top of the window. I will use `left_click` to focus it.
-6.  **Action:** `left_click(0.45, 0.12)`
-
----
-## Your Response Format
-
-See: [description of screen]
-Think: [your reasoning and tool choice]
-Action: [command]"""
+    def think(self, task, screenshot_data):
+        prompt = _THINK_PROMPT_TEMPLATE.format(task=task)
 
         try:
             from google.genai import types
-            
+
+            # capture_to_bytes hands us raw JPEG bytes; tolerate base64 text
+            # from any older caller
+            if isinstance(screenshot_data, (bytes, bytearray)):
+                image_bytes = bytes(screenshot_data)
+            else:
+                image_bytes = base64.b64decode(screenshot_data)
+
             contents = [
                 types.Content(
                     role="user",
                     parts=[
                         types.Part.from_text(text=prompt),
                         types.Part.from_bytes(
-                            data=base64.b64decode(screenshot_data),
+                            data=image_bytes,
                             mime_type="image/jpeg"
                         ),
                     ],
@@ -596,32 +949,29 @@ Action: [command]"""
             )
             
             response_text = response.text.strip()
-            
-            # Parse the response to extract observation, thinking, and action
-            lines = response_text.split('\n')
+
+            # Parse See/Think/Action with a single compiled-regex pass instead of
+            # probing every line with a chain of startswith checks
             see_line = ""
             think_line = ""
             action = ""
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith("See:"):
-                    see_line = line[4:].strip()
-                elif line.startswith("Think:"):
-                    think_line = line[6:].strip()
-                elif line.startswith("Action:"):
-                    action = line[7:].strip()
+
+            for match in _RESP_RE.finditer(response_text):
+                field = match.group(1).lower()
+                value = match.group(2).strip().rstrip('*').strip()
+                if field == "see" and not see_line:
+                    see_line = value
+                elif field == "think" and not think_line:
+                    think_line = value
+                elif field == "action":
+                    action = value
                     break  # Stop after finding action to avoid parsing extra text
-                elif line.startswith("**See:**"):
-                    see_line = line[8:].strip()
-                elif line.startswith("**Think:**"):
-                    think_line = line[9:].strip()
-                elif line.startswith("**Action:**"):
-                    action = line[11:].strip()
-                    break
-                elif not see_line and not think_line and not action and line and not line.startswith("**"):
-                    # Fallback - treat as action if it looks like a command
-                    if any(cmd in line for cmd in ["left_click", "type_text", "bulk_type", "hotkey", "done", "wait", "scroll"]):
+
+            if not see_line and not think_line and not action:
+                # Fallback - treat a bare line as the action if it looks like a command
+                for line in response_text.split('\n'):
+                    line = line.strip()
+                    if line and not line.startswith("**") and any(cmd in line for cmd in ["left_click", "type_text", "bulk_type", "hotkey", "done", "wait", "scroll"]):
                         action = line
                         break
             
@@ -646,9 +996,8 @@ Action: [command]"""
             # Handle rate limiting
             if "429" in error_str or "RESOURCE_EXHAUSTED" in error_str:
                 print("⏳ Rate limit hit - waiting before retry...")
-                import re
                 # Extract retry delay if available
-                retry_match = re.search(r'Please retry in (\d+\.?\d*)s', error_str)
+                retry_match = _RETRY_RE.search(error_str)
                 if retry_match:
                     delay = float(retry_match.group(1))
                     print(f"⏳ Waiting {delay:.1f} seconds...")
@@ -665,127 +1014,170 @@ Action: [command]"""
     
     def execute(self, action_text):
         print(f"🤖 Harvey: {action_text}")
-        
+
+        # Constant-time dispatch on the verb instead of a startswith chain
+        verb = action_text.split("(", 1)[0].strip()
+        handler = self._ACTION_HANDLERS.get(verb)
+        if handler is None:
+            return False
+
         try:
-            # High-level tool execution
-            if action_text.startswith("open_app"):
-                app_name = self._extract_text(action_text)
-                if app_name:
-                    self._open_app_workflow(app_name)
-                return False # Task is not done, just a step
-
-            elif action_text.startswith("web_search"):
-                search_term = self._extract_text(action_text)
-                if search_term:
-                    self._web_search_workflow(search_term)
-                return False # Task is not done, just a step
-            
-            # Low-level actions
-            elif action_text.startswith("move_mouse"):
-                coords = self._extract_coords(action_text)
-                if coords:
-                    print(f"   → Moving cursor to position")
-                    move_mouse(coords[0], coords[1])
-                    
-            elif action_text.startswith("left_click"):
-                coords = self._extract_coords(action_text)
-                if coords:
-                    print(f"   → Precise clicking to select/activate")
-                    left_click(coords[0], coords[1])
-                    
-            elif action_text.startswith("double_click"):
-                coords = self._extract_coords(action_text)
-                if coords:
-                    print(f"   → Double-clicking to open/activate")
-                    double_click(coords[0], coords[1])
-                    
-            elif action_text.startswith("hover"):
-                coords = self._extract_coords(action_text)
-                if coords:
-                    print(f"   → Hovering to reveal menu/tooltip")
-                    hover(coords[0], coords[1])
-                    
-            elif action_text.startswith("bulk_type"):
-                text = self._extract_text(action_text)
-                if text:
-                    print(f"   → Bulk typing multi-line content")
-                    self._bulk_type_text(text)
-                    
-            elif action_text.startswith("type_text"):
-                text = self._extract_text(action_text)
-                if text:
-                    print(f"   → Typing '{text}' to input text")
-                    type_text(text)
-                    
-            elif action_text.startswith("scroll"):
-                direction = self._extract_text(action_text)
-                if direction:
-                    print(f"   → Scrolling {direction}")
-                    scroll(direction)
-                    
-            elif action_text.startswith("hotkey"):
-                key = self._extract_text(action_text)
-                if key:
-                    if key == "cmd+space":
-                        print(f"   → Opening Spotlight search")
-                    elif key == "cmd+t":
-                        print(f"   → Opening new tab")
-                    elif key == "cmd+l":
-                        print(f"   → Focusing address bar")
-                    elif key == "enter" or key == "return":
-                        print(f"   → Confirming/executing action")
-                    else:
-                        print(f"   → Pressing {key} shortcut")
-                    hotkey(key)
-                    
-                    # Add strategic pause for actions that trigger slow UI animations
-                    if key in ["cmd+space", "cmd+t"]:
-                        pause_duration = 1.5
-                        print(f"⏱️  Pausing for {pause_duration}s to allow UI to settle...")
-                        time.sleep(pause_duration)
-                    
-            elif action_text.startswith("wait"):
-                ms = self._extract_number(action_text)
-                if ms:
-                    print(f"   → Waiting {ms}ms for page/app to load")
-                    time.sleep(ms / 1000)
-                    
-            elif action_text.startswith("focus_address_bar"):
-                print("   → Focusing browser address bar")
-                print("🔍 Focusing address bar with cmd+l")
-                hotkey("cmd+l")
-                time.sleep(0.3)
-                    
-            elif action_text.startswith("done"):
-                print("   → Task completed successfully")
-                return True
-                
+            return bool(handler(self, action_text))
         except Exception as e:
             print(f"Action error: {e}")
-            
         return False
 
+    # --- Action handlers (dispatched from execute via _ACTION_HANDLERS) ---
+
+    def _handle_open_app(self, action_text):
+        app_name = self._extract_text(action_text)
+        if app_name:
+            self._open_app_workflow(app_name)
+        return False  # Task is not done, just a step
+
+    def _handle_web_search(self, action_text):
+        search_term = self._extract_text(action_text)
+        if search_term:
+            self._web_search_workflow(search_term)
+        return False  # Task is not done, just a step
+
+    def _handle_move_mouse(self, action_text):
+        coords = self._extract_coords(action_text)
+        if coords:
+            print(f"   → Moving cursor to position")
+            move_mouse(coords[0], coords[1])
+
+    def _handle_left_click(self, action_text):
+        coords = self._extract_coords(action_text)
+        if coords:
+            print(f"   → Precise clicking to select/activate")
+            left_click(coords[0], coords[1])
+
+    def _handle_double_click(self, action_text):
+        coords = self._extract_coords(action_text)
+        if coords:
+            print(f"   → Double-clicking to open/activate")
+            double_click(coords[0], coords[1])
+
+    def _handle_hover(self, action_text):
+        coords = self._extract_coords(action_text)
+        if coords:
+            print(f"   → Hovering to reveal menu/tooltip")
+            hover(coords[0], coords[1])
+
+    def _handle_bulk_type(self, action_text):
+        text = self._extract_text(action_text)
+        if text:
+            print(f"   → Bulk typing multi-line content")
+            self._bulk_type_text(text)
+
+    def _handle_type_text(self, action_text):
+        text = self._extract_text(action_text)
+        if text:
+            print(f"   → Typing '{text}' to input text")
+            type_text(text)
+
+    def _handle_scroll(self, action_text):
+        direction = self._extract_text(action_text)
+        if direction:
+            print(f"   → Scrolling {direction}")
+            scroll(direction)
+
+    def _handle_hotkey(self, action_text):
+        key = self._extract_text(action_text)
+        if key:
+            if key == "cmd+space":
+                print(f"   → Opening Spotlight search")
+            elif key == "cmd+t":
+                print(f"   → Opening new tab")
+            elif key == "cmd+l":
+                print(f"   → Focusing address bar")
+            elif key == "enter" or key == "return":
+                print(f"   → Confirming/executing action")
+            else:
+                print(f"   → Pressing {key} shortcut")
+            hotkey(key)
+
+            # Add strategic pause for actions that trigger slow UI animations
+            if key in ["cmd+space", "cmd+t"]:
+                pause_duration = 1.5
+                print(f"⏱️  Pausing for {pause_duration}s to allow UI to settle...")
+                time.sleep(pause_duration)
+
+    def _handle_wait(self, action_text):
+        ms = self._extract_number(action_text)
+        if ms:
+            print(f"   → Waiting {ms}ms for page/app to load")
+            time.sleep(ms / 1000)
+
+    def _handle_focus_address_bar(self, action_text):
+        print("   → Focusing browser address bar")
+        print("🔍 Focusing address bar with cmd+l")
+        hotkey("cmd+l")
+        time.sleep(0.3)
+
+    def _handle_done(self, action_text):
+        print("   → Task completed successfully")
+        return True
+
+    # New verbs register here in O(1) rather than extending an elif chain
+    _ACTION_HANDLERS = {
+        "open_app": _handle_open_app,
+        "web_search": _handle_web_search,
+        "move_mouse": _handle_move_mouse,
+        "left_click": _handle_left_click,
+        "double_click": _handle_double_click,
+        "hover": _handle_hover,
+        "bulk_type": _handle_bulk_type,
+        "type_text": _handle_type_text,
+        "scroll": _handle_scroll,
+        "hotkey": _handle_hotkey,
+        "wait": _handle_wait,
+        "focus_address_bar": _handle_focus_address_bar,
+        "done": _handle_done,
+    }
+
     def _bulk_type_text(self, text: str):
         """Type longer text with line breaks efficiently."""
+        if _APPKIT_AVAILABLE and _QUARTZ_AVAILABLE:
+            # One pasteboard write + cmd+v instead of a key event per character
+            pb = NSPasteboard.generalPasteboard()
+            pb.clearContents()
+            pb.setString_forType_(text, NSPasteboardTypeString)
+            hotkey("cmd+v")
+            time.sleep(0.15)  # Let the target app ingest the paste
+            return
+
+        # Fallback: per-line synthetic typing
         lines = text.split('\n')
         for i, line in enumerate(lines):
             if line.strip():  # Skip empty lines
                 type_text(line)
             if i < len(lines) - 1:  # Don't add extra line break after last line
                 hotkey("enter")
-                time.sleep(0.1)  # Brief pause between lines
+                if _LINE_DELAY > 0:
+                    time.sleep(_LINE_DELAY)
+        time.sleep(0.15)  # One drain wait for the whole block
     
     def _open_app_workflow(self, app_name: str):
         """Executes the complete, reliable sequence for opening a macOS application."""
         print(f"   Workflow: Opening application '{app_name}'")
         hotkey("cmd+space")
-        time.sleep(1.5)  # Wait for Spotlight animation
-        
+        if _APPKIT_AVAILABLE:
+            # Exit as soon as Spotlight takes focus - 1.5s is now the ceiling
+            _wait_until(_is_spotlight_active, 1.5)
+        else:
+            time.sleep(1.5)  # Wait for Spotlight animation
+
         type_text(app_name)
         time.sleep(0.5)
-        
+
         hotkey("enter")
-        time.sleep(2.0)  # Wait for App to launch
+        if _APPKIT_AVAILABLE:
+            # App launch usually lands in a few hundred ms; 2s is the ceiling
+            _wait_until(lambda: _get_frontmost_app_name() == app_name, 2.0)
+        else:
+            time.sleep(2.0)  # Wait for App to launch
         print(f"   ✅ Workflow complete: '{app_name}' should be open.")
 
     def _web_search_workflow(self, search_term: str):
@@ -826,16 +1218,7 @@ Action: [command]"""
 
             if action.startswith("hotkey"):
                 key = self._extract_text(action) or "shortcut"
-                if key == "cmd+space":
-                    reason = "Opening Spotlight."
-                elif key == "cmd+t":
-                    reason = "Opening new tab."
-                elif key in ("enter", "return"):
-                    reason = "Pressing Enter."
-                elif key == "cmd+l":
-                    reason = "Focusing address bar."
-                else:
-                    reason = f"Pressing {key}."
+                reason = _STATIC_REASONS.get(key) or f"Pressing {key}."
             elif action.startswith("bulk_type"):
                 txt = self._extract_text(action) or "text"
                 line_count = len(txt.split('\n'))
@@ -846,24 +1229,10 @@ Action: [command]"""
                     txt = txt[:17] + "..."
                 reason = f"Typing {txt}."
             elif action.startswith("left_click"):
-                coords = self._extract_coords(action)
-                # Extract specific target from see_line for better narration
-                if see_line:
-                    target_lower = see_line.lower()
-                    if "compose" in target_lower:
-                        reason = "Clicking compose button."
-                    elif "subject" in target_lower:
-                        reason = "Clicking subject field."
-                    elif "message" in target_lower or "body" in target_lower:
-                        reason = "Clicking message body."
-                    elif "button" in target_lower:
-                        reason = "Clicking button."
-                    elif "icon" in target_lower:
-                        reason = "Clicking icon."
-                    else:
-                        reason = f"Clicking target."
-                else:
-                    reason = "Clicking target."
+                # Narrate the specific target from the See line where possible
+                target_lower = see_line.lower() if see_line else ""
+                reason = next((phrase for needle, phrase in _CLICK_TARGETS
+                               if needle in target_lower), "Clicking target.")
             elif action.startswith("double_click"):
                 reason = "Double-clicking to open."
             elif action.startswith("hover"):
@@ -880,28 +1249,82 @@ Action: [command]"""
 
             if reason:
                 print(f"🎵 Speaking: '{reason}'")
-                # Generate audio file then play it via macOS afplay
-                try:
-                    audio_path = tts_speak(reason)
-                    if audio_path:
-                        print(f"🔊 Playing audio from: {audio_path}")
-                        result = subprocess.run(["afplay", audio_path], capture_output=True, text=True)
-                        if result.returncode != 0:
-                            print(f"❌ afplay failed: {result.stderr}")
-                        else:
-                            print("✅ Audio played successfully")
-                    else:
-                        print("❌ TTS failed to generate audio")
-                except Exception as e:
-                    print(f"❌ TTS error: {e}")
+                # Hand off to the audio worker - the step loop moves straight
+                # on to execute() instead of blocking for the clip duration
+                self._tts_executor.submit(self._play_reason, reason)
         except Exception:
             # Never let TTS errors break core automation
             pass
-    
+
+    def _play_reason(self, reason: str):
+        """Generate (or fetch cached) audio and start playback; runs on the worker thread."""
+        try:
+            # Cut off any still-playing phrase so speech doesn't pile up
+            if self._current_player is not None and self._current_player.isPlaying():
+                self._current_player.stop()
+            if self._last_audio_proc and self._last_audio_proc.poll() is None:
+                self._last_audio_proc.terminate()
+
+            audio_path = self._cached_tts(reason)
+            if not audio_path:
+                print("❌ TTS failed to generate audio")
+                return
+
+            if _LOG >= 2:
+                print(f"🔊 Playing audio from: {audio_path}")
+
+            if _AVFOUNDATION_AVAILABLE:
+                # In-process playback - no process spawn per phrase. Players
+                # are cached per clip, so repeats skip file decode and
+                # prepareToPlay and just rewind the warm audio unit.
+                player = self._player_cache.get(audio_path)
+                if player is None:
+                    url = NSURL.fileURLWithPath_(audio_path)
+                    player, err = AVAudioPlayer.alloc().initWithContentsOfURL_error_(url, None)
+                    if player is not None:
+                        player.prepareToPlay()
+                        self._player_cache[audio_path] = player
+                if player is not None:
+                    player.setCurrentTime_(0)
+                    player.play()
+                    self._current_player = player
+                    return
+
+            # Popen, not run - playback overlaps the next screenshot/think
+            self._last_audio_proc = subprocess.Popen(
+                ["afplay", audio_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except Exception as e:
+            print(f"❌ TTS error: {e}")
+
+    def _cached_tts(self, reason: str):
+        """Return an audio path for the phrase, generating it only on first use.
+
+        The canned rationales repeat constantly, so audio is keyed by a
+        SHA-256 of the normalized phrase: an in-process memo skips even the
+        stat() call, and the on-disk cache survives restarts.
+        """
+        key = hashlib.sha256(reason.strip().lower().encode()).hexdigest()
+        cached = self._tts_memo.get(key)
+        if cached:
+            return cached
+
+        self._tts_cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_path = self._tts_cache_dir / f"{key}.mp3"
+        if not cache_path.exists():
+            audio_path = tts_speak(reason)
+            if not audio_path:
+                return None
+            shutil.move(audio_path, cache_path)
+
+        self._tts_memo[key] = str(cache_path)
+        return str(cache_path)
+
     def _extract_coords(self, text):
         """Extract and validate (ratio_x, ratio_y) from action text."""
-        import re
-        match = re.search(r'\(([0-9.]+),\s*([0-9.]+)\)', text)
+        match = _COORDS_RE.search(text)
         if match:
             ratio_x = float(match.group(1))
             ratio_y = float(match.group(2))
@@ -915,63 +1338,92 @@ Action: [command]"""
         return None
     
     def _extract_text(self, text):
-        import re
-        match = re.search(r'"([^"]*)"', text)
+        match = _QUOTED_RE.search(text)
         if match:
             return match.group(1)
         return None
     
     def _extract_number(self, text):
-        import re
-        match = re.search(r'\((\d+)\)', text)
+        match = _PARENNUM_RE.search(text)
         if match:
             return int(match.group(1))
         return None
     
+    def _downscale(self, raw_jpeg, max_edge=1280):
+        """Shrink a screenshot JPEG before upload - Gemini tiles to ~768px anyway.
+
+        Returns raw JPEG bytes. Action coordinates are unaffected because they
+        are normalized 0-1 ratios, not pixels.
+        """
+        try:
+            from PIL import Image
+            img = Image.open(io.BytesIO(raw_jpeg))
+            if max(img.size) <= max_edge:
+                return raw_jpeg
+            img.thumbnail((max_edge, max_edge), Image.BILINEAR)
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=80)
+            return buf.getvalue()
+        except Exception as e:
+            print(f"⚠️ Downscale failed, sending full-size screenshot: {e}")
+            return raw_jpeg
+
     def run(self, task):
         print(f"🚀 Harvey starting: {task}")
-        
+
         for step in range(20):
             print(f"📸 Taking screenshot to analyze current state...")
             screenshot_data = capture_to_bytes()
-            
-            # DEBUG: Save the first screenshot to see what Harvey is seeing
-            if step == 0 and screenshot_data:
-                print(f"💾 Screenshot data length: {len(screenshot_data)} characters")
+            if screenshot_data:
+                # Retina captures are 4-10x more upload bytes than the model uses
+                screenshot_data = self._downscale(screenshot_data)
+
+            # DEBUG: Save the first screenshot to see what Harvey is seeing.
+            # Disk write + PIL reopen sit on the first model call's critical
+            # path, so production runs (HARVEY_DEBUG unset) skip all of it.
+            if step == 0 and self._debug and screenshot_data:
+                print(f"💾 Screenshot data length: {len(screenshot_data)} bytes")
                 print("💾 Saving debug screenshot as 'harvey_debug.jpg'")
                 with open("harvey_debug.jpg", "wb") as f:
-                    f.write(base64.b64decode(screenshot_data))
+                    f.write(screenshot_data)
                 print("✅ Debug screenshot saved! Check harvey_debug.jpg to see what Harvey sees.")
-                
+
                 # Also check image dimensions
                 try:
                     from PIL import Image
-                    import io
-                    img_bytes = base64.b64decode(screenshot_data)
-                    img = Image.open(io.BytesIO(img_bytes))
+                    img = Image.open(io.BytesIO(screenshot_data))
                     print(f"🖼️  Image dimensions: {img.size[0]}x{img.size[1]} pixels")
                 except Exception as e:
                     print(f"❌ Error reading image: {e}")
                 # Log screen points and scale for mapping verification
-                try:
-                    sw, sh, sc = get_screen_info()
-                    print(f"🖥️  Screen points: {sw}x{sh}, scale: {sc:.1f}x")
-                except Exception:
-                    pass
+                print(f"🖥️  Screen points: {self._screen_w}x{self._screen_h}, scale: {self._screen_scale:.1f}x")
             
             if not screenshot_data:
                 print("❌ Failed to capture screenshot")
                 break
-                
+
+            # Identical consecutive frames (missed click, app still loading)
+            # don't deserve a multi-second Gemini round-trip - compare an
+            # 8-byte hash and wait for the screen to change, capped at 3
+            # skips so a genuinely static screen still reaches the model
+            frame_hash = hashlib.blake2b(screenshot_data, digest_size=8).digest()
+            if frame_hash == self._last_hash and self._skipped_frames < 3:
+                self._skipped_frames += 1
+                print(f"⏭️  Screen unchanged - waiting instead of re-thinking ({self._skipped_frames}/3)")
+                time.sleep(0.5)
+                continue
+            self._last_hash = frame_hash
+            self._skipped_frames = 0
+
             action = self.think(task, screenshot_data)
             # Speak a short rationale before executing the action
             self._speak_rationale(action, getattr(self, "last_see", ""), task)
             done = self.execute(action)
-            
+
             if done:
                 print("✅ Task complete!")
                 break
-        
+
         print("🏁 Harvey finished")
 
 def main():